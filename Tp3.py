@@ -1,132 +1,401 @@
 import sys
 import heapq
 import time
-from collections import Counter
+from collections import Counter, deque
 import math
+import operator
 import os
-
-class Node:
-    def __init__(self, byte=None, freq=None, left=None, right=None):
-        self.byte = byte
-        self.freq = freq
-        self.left = left
-        self.right = right
-
-    def __lt__(self, other):
-        return self.freq < other.freq
-
-def create_huffman_tree(frequencies):
-    heap = [Node(byte, freq) for byte, freq in frequencies.items()]
+import struct
+
+# Cantidad de bits que se consumen por búsqueda en la tabla principal del decodificador
+DECODE_TABLE_BITS = 11
+
+# Longitud máxima de código para usar siempre el decodificador de a un byte por búsqueda
+BYTE_DECODE_MAX_LEN = 8
+
+# Con códigos más largos se usa igual si hay al menos esta cantidad de bytes comprimidos
+# por entrada de su tabla, para que valga la pena armarla
+BYTE_DECODE_MIN_RATIO = 4
+
+# Tamaño de los bloques en que se leen y escriben los archivos
+CHUNK_SIZE = 1 << 20
+
+# Identificador del formato (y su versión) al principio de cada archivo comprimido
+MAGIC = b'TP3\x01'
+
+# Encabezado del archivo comprimido: identificador, tabla de frecuencias (256 enteros
+# de 4 bytes) y cantidad total de bits comprimidos (8 bytes), todo big-endian
+HEADER = struct.Struct('>4s256IQ')
+
+# A partir de cuántos bloques conviene repartir la codificación entre procesos: cada bloque
+# tarda ~0.13 s en codificarse y levantar los procesos cuesta ~0.15-0.2 s donde se usa spawn
+# (Windows, macOS), así que con menos de 4 bloques la ganancia no alcanza a cubrirlo
+PARALLEL_MIN_CHUNKS = 4
+
+# Máximo de procesos para codificar; se mantienen a lo sumo el doble de bloques en vuelo,
+# así la memoria queda acotada aunque la máquina tenga muchos núcleos
+PARALLEL_MAX_WORKERS = 8
+
+def read_chunks(f):
+    """Lee f por bloques sobre un único buffer; cada memoryview es válido hasta pedir el siguiente"""
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    while size := f.readinto(view):
+        yield view[:size]
+
+def count_frequencies(f):
+    """Cuenta las apariciones de cada byte leyendo f por bloques; devuelve una lista densa de 256 posiciones"""
+    counter = Counter()
+    for chunk in read_chunks(f):
+        counter.update(chunk)
+    counts = [0] * 256
+    for byte, freq in counter.items():
+        counts[byte] = freq
+    return counts
+
+def huffman_code_lengths(frequencies):
+    """Calcula la longitud del código de Huffman de cada byte; devuelve una lista densa de 256 posiciones.
+
+    Solo se arma el vector de padres de los nodos: las hojas son 0..n-1 y cada fusión agrega un nodo interno.
+    """
+    symbols = list(frequencies)
+    heap = [(freq, node) for node, freq in enumerate(frequencies.values())]
     heapq.heapify(heap)
+    parent = [0] * len(symbols)
 
     while len(heap) > 1:
-        left = heapq.heappop(heap)
-        right = heapq.heappop(heap)
-        merged = Node(None, left.freq + right.freq, left, right)
-        heapq.heappush(heap, merged)
-
-    return heap[0]
-
-def generate_codes(node, prefix="", codebook=None):
-    if codebook is None:
-        codebook = {}
-
-    if node.byte is not None:
-        codebook[node.byte] = prefix
-    else:
-        generate_codes(node.left, prefix + "0", codebook)
-        generate_codes(node.right, prefix + "1", codebook)
-
-    return codebook
-
-def bits_to_bytes(bits):
-    byte_arr = bytearray()
-    for i in range(0, len(bits), 8):
-        byte = bits[i:i+8]
-        byte_arr.append(int(byte, 2))
-    return byte_arr
-
-def bytes_to_bits(byte_arr):
-    bits = []
-    for byte in byte_arr:
-        bits.append(f'{byte:08b}')
-    return ''.join(bits)
-
-def calculate_entropy(frequencies, total_symbols):
+        left_freq, left = heapq.heappop(heap)
+        right_freq, right = heapq.heappop(heap)
+        merged = len(parent)
+        parent.append(0)
+        parent[left] = parent[right] = merged
+        heapq.heappush(heap, (left_freq + right_freq, merged))
+
+    # La raíz es el último nodo creado; cada padre tiene id mayor que sus hijos
+    depth = [0] * len(parent)
+    for node in range(len(parent) - 2, -1, -1):
+        depth[node] = depth[parent[node]] + 1
+
+    lengths = [0] * 256
+    for node, byte in enumerate(symbols):
+        lengths[byte] = depth[node]
+    return lengths
+
+def generate_codes(lengths):
+    """Asigna los códigos canónicos; devuelve una tabla densa de 256 entradas con (valor entero del código, longitud en bits)"""
+    codes = [None] * 256
+    code = 0
+    prev_length = 0
+    for length, byte in sorted((length, byte) for byte, length in enumerate(lengths) if length):
+        code <<= length - prev_length
+        codes[byte] = (code, length)
+        code += 1
+        prev_length = length
+    return codes
+
+def build_code_tree(huffman_codes):
+    """Arma el árbol de decodificación a partir de los códigos en tres listas paralelas (raíz = 0).
+
+    Los hijos siempre tienen id mayor que su padre.
+    """
+    left = [-1]
+    right = [-1]
+    byte_of = [-1]  # -1 en los nodos internos
+    for byte, code in enumerate(huffman_codes):
+        if code is None:
+            continue
+        value, length = code
+        node = 0
+        for shift in range(length - 1, -1, -1):
+            children = right if (value >> shift) & 1 else left
+            if children[node] < 0:
+                children[node] = len(byte_of)
+                left.append(-1)
+                right.append(-1)
+                byte_of.append(-1)
+            node = children[node]
+        byte_of[node] = byte
+    return left, right, byte_of
+
+def encode_kernel(data, huffman_codes, buf=0, nbits=0):
+    """Empaqueta los códigos de los bytes de data a continuación de los nbits pendientes en buf.
+
+    Devuelve (bytes completos, bits pendientes, cantidad de bits pendientes) para seguir con el próximo bloque.
+    """
+    # Reservar de una vez el máximo posible y escribir por índice, de a 8 bytes
+    max_len = max(code[1] for code in huffman_codes if code)
+    byte_data = bytearray((nbits + len(data) * max_len) // 8)
+    pack_into = struct.Struct('>Q').pack_into
+    pos = 0
+    # La búsqueda en la tabla se hace en C a través de map
+    for value, length in map(huffman_codes.__getitem__, data):
+        buf = (buf << length) | value
+        nbits += length
+        if nbits >= 64:
+            nbits -= 64
+            pack_into(byte_data, pos, buf >> nbits)
+            pos += 8
+            buf &= (1 << nbits) - 1  # Descartar los bits ya emitidos
+    del byte_data[pos:]
+    return byte_data, buf, nbits
+
+def splice_segment(buf, nbits, byte_data, seg_buf, seg_nbits):
+    """Agrega un segmento codificado de forma independiente a continuación de los nbits pendientes en buf.
+
+    Devuelve (bytes completos, bits pendientes, cantidad de bits pendientes).
+    """
+    if not nbits:
+        # Ya alineado a byte: el segmento se escribe tal cual
+        return byte_data, seg_buf, seg_nbits
+
+    # Desplazar todo el segmento en una sola operación sobre enteros
+    total_bits = nbits + len(byte_data) * 8 + seg_nbits
+    combined = (buf << (len(byte_data) * 8 + seg_nbits)) | (int.from_bytes(byte_data, 'big') << seg_nbits) | seg_buf
+    nbits = total_bits % 8
+    return (combined >> nbits).to_bytes(total_bits // 8, 'big'), combined & ((1 << nbits) - 1), nbits
+
+def encode_parallel(f, f_out, huffman_codes, workers):
+    """Codifica f por bloques en varios procesos y escribe los segmentos en orden en f_out.
+
+    Devuelve los bits pendientes y su cantidad, como encode_kernel.
+    """
+    # Se importa recién acá: multiprocessing tarda en cargarse y solo hace falta con archivos grandes
+    from concurrent.futures import ProcessPoolExecutor
+
+    buf = 0
+    nbits = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        while True:
+            # Mantener pocos bloques en vuelo para no cargar todo el archivo en memoria
+            while len(pending) < workers * 2 and (chunk := f.read(CHUNK_SIZE)):
+                pending.append(executor.submit(encode_kernel, chunk, huffman_codes))
+            if not pending:
+                break
+            byte_data, seg_buf, seg_nbits = pending.popleft().result()
+            byte_data, buf, nbits = splice_segment(buf, nbits, byte_data, seg_buf, seg_nbits)
+            f_out.write(byte_data)
+    return buf, nbits
+
+def build_decode_tables(left, right, byte_of, table_bits=DECODE_TABLE_BITS):
+    """Construye las tablas de decodificación de table_bits bits a partir del árbol aplanado.
+
+    Cada entrada vale simbolo | (bits consumidos << 8), o ~id de la subtabla con la que
+    se continúa cuando el código es más largo que la tabla. Devuelve (tablas, anchos, longitud máxima).
+    """
+    # Altura de cada nodo (los hijos siempre tienen id mayor que el padre)
+    height = [0] * len(byte_of)
+    for node in range(len(byte_of) - 1, -1, -1):
+        if byte_of[node] < 0:
+            height[node] = 1 + max(height[left[node]], height[right[node]])
+
+    tables = []
+    widths = []
+
+    def build(table_root):
+        width = min(table_bits, height[table_root])
+        entries = [0] * (1 << width)
+        table_id = len(tables)
+        tables.append(entries)
+        widths.append(width)
+
+        stack = [(table_root, 0, 0)]
+        while stack:
+            node, prefix, depth = stack.pop()
+            if byte_of[node] >= 0:
+                # Todas las entradas que empiezan con este código apuntan a la hoja
+                span = width - depth
+                start = prefix << span
+                entries[start:start + (1 << span)] = [byte_of[node] | (depth << 8)] * (1 << span)
+            elif depth == width:
+                entries[prefix] = ~build(node)
+            else:
+                stack.append((left[node], prefix << 1, depth + 1))
+                stack.append((right[node], (prefix << 1) | 1, depth + 1))
+        return table_id
+
+    build(0)
+    return tables, widths, height[0]
+
+def build_byte_decode_table(left, right, byte_of):
+    """Construye la tabla para decodificar un byte comprimido por búsqueda.
+
+    La entrada (nodo << 8) | byte tiene los símbolos que se completan al leer ese byte
+    partiendo del nodo interno y el nodo en el que se termina (también desplazado 8 bits).
+    """
+    def walk(node, value, bits):
+        emitted = bytearray()
+        for shift in range(bits - 1, -1, -1):
+            node = right[node] if (value >> shift) & 1 else left[node]
+            if byte_of[node] >= 0:
+                emitted.append(byte_of[node])
+                node = 0
+        return bytes(emitted), node
+
+    internal = [node for node in range(len(byte_of)) if byte_of[node] < 0]
+
+    # Primero de a 4 bits, y cada byte se arma con dos mitades
+    nibbles = {node: [walk(node, value, 4) for value in range(16)] for node in internal}
+    table = [None] * (len(byte_of) << 8)
+    for node in internal:
+        for high, (emitted_high, middle) in enumerate(nibbles[node]):
+            for low, (emitted_low, end) in enumerate(nibbles[middle]):
+                table[(node << 8) | (high << 4) | low] = (emitted_high + emitted_low, end << 8)
+    return table
+
+def decode_bytes_kernel(f_in, f_out, total_symbols, table):
+    """Decodifica total_symbols símbolos leyendo f_in por bloques, de a un byte comprimido por búsqueda"""
+    remaining = total_symbols
+    state = 0
+    for chunk in read_chunks(f_in):
+        parts = []
+        append = parts.append
+        for byte in chunk:
+            emitted, state = table[state | byte]
+            append(emitted)
+        # Los bits de relleno del final pueden generar símbolos de más
+        decoded_data = b''.join(parts)[:remaining]
+        f_out.write(decoded_data)
+        remaining -= len(decoded_data)
+        if not remaining:
+            break
+
+def decode_kernel(f_in, f_out, total_symbols, tables, widths, max_len):
+    """Decodifica total_symbols símbolos leyendo f_in por bloques y escribe el resultado en f_out.
+
+    Consume hasta DECODE_TABLE_BITS bits por búsqueda en las tablas.
+    """
+    decoded_data = bytearray()
+    append = decoded_data.append
+    unpack_from = struct.Struct('>Q').unpack_from
+
+    # Los bloques comprimidos se leen siempre sobre el mismo buffer
+    packed = bytearray(CHUNK_SIZE)
+    view = memoryview(packed)
+    size = f_in.readinto(view)
+    last_word = size - 8
+
+    root_table = tables[0]
+    root_width = widths[0]
+    root_mask = (1 << root_width) - 1
+    buf = 0
+    nbits = 0
+    pos = 0
+    for _ in range(total_symbols):
+        # Mantener en el reservorio al menos los bits del código más largo
+        while nbits < max_len:
+            if pos <= last_word:
+                word = unpack_from(packed, pos)[0]
+            else:
+                # Pasar al siguiente bloque conservando al principio los bytes sin leer
+                tail = bytes(view[pos:size])
+                packed[:len(tail)] = tail
+                more = f_in.readinto(view[len(tail):])
+                if more:
+                    size = len(tail) + more
+                    last_word = size - 8
+                    pos = 0
+                    if len(decoded_data) >= CHUNK_SIZE:
+                        f_out.write(decoded_data)
+                        decoded_data.clear()
+                    continue
+                # Fin del archivo: completar con ceros
+                word = int.from_bytes(tail.ljust(8, b'\0'), 'big')
+            buf = ((buf & ((1 << nbits) - 1)) << 64) | word
+            nbits += 64
+            pos += 8
+
+        entry = root_table[(buf >> (nbits - root_width)) & root_mask]
+        if entry < 0:
+            # Código más largo que la tabla principal: seguir en las subtablas
+            nbits -= root_width
+            while True:
+                table_id = ~entry
+                width = widths[table_id]
+                entry = tables[table_id][(buf >> (nbits - width)) & ((1 << width) - 1)]
+                if entry >= 0:
+                    break
+                nbits -= width
+
+        append(entry & 0xFF)
+        nbits -= entry >> 8
+    f_out.write(decoded_data)
+
+def calculate_entropy(counts, total_symbols):
     """Calcula la entropía del conjunto de símbolos"""
-    entropy = 0
-    for freq in frequencies.values():
-        probability = freq / total_symbols
-        entropy -= probability * math.log2(probability)
-    return entropy
-
-def calculate_average_length(huffman_codes, frequencies, total_symbols):
-    """Calcula la longitud media de un código"""
-    avg_length = 0
-    for byte, code in huffman_codes.items():
-        freq = frequencies[byte]
-        avg_length += len(code) * (freq / total_symbols)
-    return avg_length
+    # H = log2(N) - sum(f * log2(f)) / N, sin calcular cada probabilidad por separado
+    log2 = math.log2
+    return log2(total_symbols) - sum(freq * log2(freq) for freq in counts if freq) / total_symbols
+
+def calculate_average_length(total_bits, total_symbols):
+    """Calcula la longitud media de un código a partir del total de bits que ocupa la codificación"""
+    return total_bits / total_symbols
 
 def calculate_compression_metrics(entropy, avg_length):
-    # Rendimiento (entropía sobre la longitud media, multiplicado por 100)
-    efficiency = (entropy / avg_length) * 100
+    # Rendimiento (entropía sobre la longitud media, multiplicado por 100).
+    # Con un solo símbolo no hace falta ningún bit: el código es óptimo
+    efficiency = (entropy / avg_length) * 100 if avg_length else 100
 
     # Redundancia
     redundancy = 100 - efficiency
 
     return efficiency, redundancy
 
-def compress_file(original, compressed):
-    with open(original, 'rb') as f:
-        data = f.read()
+def is_same_file(path, other):
+    """Indica si las dos rutas apuntan al mismo archivo existente"""
+    return os.path.exists(path) and os.path.exists(other) and os.path.samefile(path, other)
 
-    # Contar las frecuencias de los bytes
-    frequencies = Counter(data)
+def compress_file(original, compressed, show_metrics=True):
+    # La entrada se lee mientras se escribe la salida: no pueden ser el mismo archivo
+    if is_same_file(original, compressed):
+        print(f"Error: El archivo comprimido '{compressed}' no puede ser el mismo que el original.")
+        return
 
-    # Crear el árbol de Huffman
-    huffman_tree = create_huffman_tree(frequencies)
+    # Contar las frecuencias de los bytes (primera pasada)
+    with open(original, 'rb') as f:
+        counts = count_frequencies(f)
+    frequencies = {byte: freq for byte, freq in enumerate(counts) if freq}
 
-    # Generar el código de Huffman para cada byte
-    huffman_codes = generate_codes(huffman_tree)
+    # Calcular las longitudes de los códigos de Huffman
+    lengths = huffman_code_lengths(frequencies)
 
-    # Codificar los bytes
-    encoded_data = ''.join(huffman_codes[byte] for byte in data)
+    # Generar el código canónico de Huffman para cada byte
+    huffman_codes = generate_codes(lengths)
 
-    # Calcular el número de bits de relleno necesarios
-    padding = 8 - len(encoded_data) % 8
-    encoded_data += '0' * padding
+    # El tamaño total codificado y los bits de relleno se conocen de antemano a partir de las frecuencias
+    total_bits = sum(map(operator.mul, lengths, counts))
+    padding = -total_bits % 8
 
     # Guardar el archivo comprimido
-    with open(compressed, 'wb') as f_out:
-        # Guardar las frecuencias de los bytes
-        f_out.write(len(frequencies).to_bytes(2, 'big'))  # Cantidad de bytes distintos
-        for byte, freq in frequencies.items():
-            f_out.write(bytes([byte]))  # Escribimos el byte
-            
-            # Determinar cuántos bytes necesitamos para almacenar la frecuencia
-            if freq <= 255:
-                f_out.write(bytes([1]))  # Longitud de codificación
-                f_out.write(freq.to_bytes(1, 'big'))  # Escribimos la frecuencia en 1 byte
-            elif freq <= 65535:
-                f_out.write(bytes([2]))  # Longitud de codificación
-                f_out.write(freq.to_bytes(2, 'big'))  # Escribimos la frecuencia en 2 bytes
-            elif freq <= 16777215:
-                f_out.write(bytes([3]))  # Longitud de codificación
-                f_out.write(freq.to_bytes(3, 'big'))  # Escribimos la frecuencia en 3 bytes
+    with open(original, 'rb') as f, open(compressed, 'wb', buffering=CHUNK_SIZE) as f_out:
+        # Guardar en una sola escritura el identificador, la tabla de frecuencias (una entrada por
+        # cada valor de byte) y la cantidad total de bits comprimidos (el resto del último byte es relleno)
+        f_out.write(HEADER.pack(MAGIC, *counts, total_bits))
+
+        # Con un solo byte distinto (o un archivo vacío) la tabla de frecuencias ya
+        # alcanza para reconstruir el archivo: no se guardan bits comprimidos
+        if len(frequencies) > 1:
+            # Codificar los bytes por bloques (segunda pasada), arrastrando los bits pendientes
+            workers = min(os.cpu_count() or 1, PARALLEL_MAX_WORKERS)
+            if workers > 1 and sum(counts) >= PARALLEL_MIN_CHUNKS * CHUNK_SIZE:
+                buf, nbits = encode_parallel(f, f_out, huffman_codes, workers)
             else:
-                f_out.write(bytes([4]))  # Longitud de codificación
-                f_out.write(freq.to_bytes(4, 'big'))  # Escribimos la frecuencia en 4 bytes
+                buf = 0
+                nbits = 0
+                for chunk in read_chunks(f):
+                    byte_data, buf, nbits = encode_kernel(chunk, huffman_codes, buf, nbits)
+                    f_out.write(byte_data)
 
-        # Guardar el número de bits de relleno
-        f_out.write(bytes([padding]))
+            # Escribir los bits pendientes completando el último byte con los bits de relleno
+            if nbits:
+                f_out.write((buf << padding).to_bytes((nbits + padding) // 8, 'big'))
 
-        # Guardar los bits comprimidos
-        byte_data = bits_to_bytes(encoded_data)
-        f_out.write(byte_data)
+    print(f"Archivo comprimido guardado como {compressed}")
 
-    # Tamaños para métricas
-    total_symbols = len(data)  # Cantidad total de símbolos
+    # Tamaños para métricas (un archivo vacío no tiene métricas)
+    total_symbols = sum(counts)  # Cantidad total de símbolos
+    if not show_metrics or not total_symbols:
+        return
     original_size = os.path.getsize(original)  # Tamaño original en bytes
     compressed_size = os.path.getsize(compressed)  # Tamaño del archivo comprimido en bytes
 
@@ -134,74 +403,74 @@ def compress_file(original, compressed):
     compression_ratio = (compressed_size / original_size) * 100
 
     # Calcular la entropía
-    entropy = calculate_entropy(frequencies, total_symbols)
+    entropy = calculate_entropy(counts, total_symbols)
 
     # Calcular la longitud media del código
-    avg_length = calculate_average_length(huffman_codes, frequencies, total_symbols)
+    avg_length = calculate_average_length(total_bits, total_symbols)
 
     # Calcular el rendimiento y la redundancia
     efficiency, redundancy = calculate_compression_metrics(entropy, avg_length)
 
-    print(f"Archivo comprimido guardado como {compressed}")
     print(f"Entropía: {entropy:.4f}")
     print(f"Longitud media del código: {avg_length:.4f}")
     print(f"Rendimiento: {efficiency:.4f}%")
     print(f"Redundancia: {redundancy:.4f}%")
     print(f"Tasa de compresión: {compression_ratio:.2f}%")  # Imprimir la tasa de compresión
 
-def decompress_file(original, compressed):
+def decompress_file(original, compressed, show_metrics=True):
     try:
+        # La entrada se lee mientras se escribe la salida: no pueden ser el mismo archivo
+        if is_same_file(compressed, original):
+            print(f"Error: El archivo descomprimido '{original}' no puede ser el mismo que el comprimido.")
+            return
+
         # Abrir el archivo comprimido para lectura
         with open(compressed, 'rb') as f_in:
-            # Leer la cantidad de bytes distintos (2 bytes)
-            num_bytes = int.from_bytes(f_in.read(2), 'big')
-            frequencies = {}
-            
-            # Leer las frecuencias de los caracteres
-            for _ in range(num_bytes):
-                byte = f_in.read(1)[0]  # Leer el byte
-                length = f_in.read(1)[0]  # Leer la longitud de codificación (1 byte)
-                
-                # Leer la frecuencia dependiendo de la longitud de codificación
-                if length == 1:
-                    freq = int.from_bytes(f_in.read(1), 'big')  # Frecuencia en 1 byte
-                elif length == 2:
-                    freq = int.from_bytes(f_in.read(2), 'big')  # Frecuencia en 2 bytes
-                elif length == 3:
-                    freq = int.from_bytes(f_in.read(3), 'big')  # Frecuencia en 3 bytes
-                else:
-                    freq = int.from_bytes(f_in.read(4), 'big')  # Frecuencia en 4 bytes
-                
-                frequencies[byte] = freq
-
-            # Reconstruir el árbol de Huffman
-            huffman_tree = create_huffman_tree(frequencies)
-
-            # Leer el número de bits de relleno
-            padding = f_in.read(1)[0]
-
-            # Leer los bits comprimidos
-            byte_data = f_in.read()    
-            encoded_data = bytes_to_bits(byte_data)
-
-            # Eliminar los bits de relleno
-            encoded_data = encoded_data[:-padding]
-
-        # Decodificar el archivo binario usando el árbol de Huffman
-        decoded_data = bytearray()
-        node = huffman_tree
-        for bit in encoded_data:
-            node = node.left if bit == '0' else node.right
-            if node.byte is not None:
-                decoded_data.append(node.byte)
-                node = huffman_tree
-
-        # Ahora creamos y escribimos el archivo descomprimido ('original') desde cero
-        with open(original, 'wb') as f_out:
-            f_out.write(decoded_data)
-
-     # Tamaños para métricas
-        total_symbols = sum(frequencies.values())  # Total de símbolos en el archivo original
+            # Leer el encabezado: identificador, tabla de frecuencias y cantidad total de bits comprimidos
+            raw = f_in.read(HEADER.size)
+            if raw[:len(MAGIC)] != MAGIC:
+                raise ValueError("el archivo no tiene un formato comprimido reconocido")
+            if len(raw) < HEADER.size:
+                raise ValueError("el archivo comprimido está incompleto")
+            _, *counts, total_bits = HEADER.unpack(raw)
+            frequencies = {byte: freq for byte, freq in enumerate(counts) if freq}
+
+            # Reconstruir los códigos canónicos de Huffman
+            lengths = huffman_code_lengths(frequencies)
+            huffman_codes = generate_codes(lengths)
+
+            # Verificar que estén todos los bits comprimidos
+            payload_size = os.fstat(f_in.fileno()).st_size - f_in.tell()
+            if payload_size < (total_bits + 7) // 8:
+                raise ValueError("el archivo comprimido está incompleto")
+
+            # Decodificar los bits comprimidos con las tablas del árbol de Huffman y
+            # crear el archivo descomprimido ('original') desde cero
+            total_symbols = sum(frequencies.values())  # Total de símbolos en el archivo original
+            with open(original, 'wb', buffering=CHUNK_SIZE) as f_out:
+                if len(frequencies) > 1:
+                    left, right, byte_of = build_code_tree(huffman_codes)
+                    table_entries = (len(frequencies) - 1) * 256
+                    if max(lengths) <= BYTE_DECODE_MAX_LEN or payload_size >= BYTE_DECODE_MIN_RATIO * table_entries:
+                        # Cada byte comprimido se decodifica con una sola búsqueda
+                        table = build_byte_decode_table(left, right, byte_of)
+                        decode_bytes_kernel(f_in, f_out, total_symbols, table)
+                    else:
+                        tables, widths, max_len = build_decode_tables(left, right, byte_of)
+                        decode_kernel(f_in, f_out, total_symbols, tables, widths, max_len)
+                elif frequencies:
+                    # Un solo byte distinto: se repite tantas veces como indica su frecuencia
+                    (byte, freq), = frequencies.items()
+                    block = bytes([byte]) * min(freq, CHUNK_SIZE)
+                    for _ in range(freq // len(block)):
+                        f_out.write(block)
+                    f_out.write(block[:freq % len(block)])
+
+        print(f"Archivo descomprimido guardado como {original}")
+        if not show_metrics or not total_symbols:
+            return
+
+        # Tamaños para métricas
         compressed_size = os.path.getsize(compressed)  # Tamaño del archivo comprimido en bytes
         decompressed_size = os.path.getsize(original)  # Tamaño del archivo descomprimido
 
@@ -209,18 +478,14 @@ def decompress_file(original, compressed):
         compression_ratio = (compressed_size / decompressed_size) * 100
 
         # Calcular la entropía
-        entropy = calculate_entropy(frequencies, total_symbols)
-
-        # Generar códigos de Huffman para los cálculos de longitud media
-        huffman_codes = generate_codes(huffman_tree)
+        entropy = calculate_entropy(counts, total_symbols)
 
         # Calcular la longitud media del código
-        avg_length = calculate_average_length(huffman_codes, frequencies, total_symbols)
+        avg_length = calculate_average_length(total_bits, total_symbols)
 
         # Calcular el rendimiento y la redundancia
         efficiency, redundancy = calculate_compression_metrics(entropy, avg_length)
 
-        print(f"Archivo descomprimido guardado como {original}")
         print(f"Rendimiento: {efficiency:.4f}%")
         print(f"Redundancia: {redundancy:.4f}%")
         print(f"Tasa de compresión (al descomprimir): {compression_ratio:.2f}%")
@@ -230,23 +495,24 @@ def decompress_file(original, compressed):
     except Exception as e:
         print(f"Error durante la descompresión: {e}")
 def main():
-    if len(sys.argv) != 4:
-        print("Uso: python Tp3 {-c|-d} original compressed")
+    if len(sys.argv) not in (4, 5) or (len(sys.argv) == 5 and sys.argv[4] != '--sin-metricas'):
+        print("Uso: python Tp3 {-c|-d} original compressed [--sin-metricas]")
         sys.exit(1)
 
     flag = sys.argv[1]
     original = sys.argv[2]
     compressed = sys.argv[3]
+    show_metrics = len(sys.argv) == 4
 
     if flag == '-c':
         start_time = time.time()
-        compress_file(original, compressed)
+        compress_file(original, compressed, show_metrics)
         end_time = time.time()  # Fin del tiempo de compresión
         elapsed_time = end_time - start_time
         print(f"Tiempo de compresión: {elapsed_time:.4f} segundos")
     elif flag == '-d':
         start_time = time.time()
-        decompress_file(original, compressed)
+        decompress_file(original, compressed, show_metrics)
         end_time = time.time()  # Fin del tiempo de compresión
         elapsed_time = end_time - start_time
         print(f"Tiempo de descompresión: {elapsed_time:.4f} segundos")